@@ -21,25 +21,96 @@ Register this in ~/.claude/settings.json:
   }
 """
 
-import subprocess
+import hashlib
+import importlib.util
 import sys
 from pathlib import Path
 
-APPLY_SCRIPT = Path.home() / ".claude" / "skills" / "auto-approve" / "scripts" / "apply_permissions.py"
+SKILL_DIR = Path.home() / ".claude" / "skills" / "auto-approve"
+APPLY_SCRIPT = SKILL_DIR / "scripts" / "apply_permissions.py"
+COMMON_MODULE = SKILL_DIR / "scripts" / "_common.py"
+FINGERPRINT_FILE = SKILL_DIR / ".cache" / "fingerprint"
+SETTINGS_FILE = Path.home() / ".claude" / "settings.json"
+
+
+def load_module(name, path):
+    # Loaded by path under a skill-specific name, so nothing is added to sys.path
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def fingerprint(mod):
+    """Hash of the managed patterns, the merge code and the settings file, or None if either file is missing."""
+    try:
+        settings_stat = SETTINGS_FILE.stat()
+        # _common.py's stat stands in for its version, so a skill upgrade re-runs the merge
+        common_stat = COMMON_MODULE.stat()
+    except FileNotFoundError:
+        return None
+    state = (
+        mod.ALLOW_PATTERNS,
+        mod.DENY_PATTERNS,
+        common_stat.st_mtime_ns,
+        common_stat.st_size,
+        settings_stat.st_mtime_ns,
+        settings_stat.st_size,
+    )
+    return hashlib.blake2b(repr(state).encode()).hexdigest()
+
+
+def read_fingerprint():
+    try:
+        return FINGERPRINT_FILE.read_text()
+    except OSError:
+        return None
+
 
 def main():
     if not APPLY_SCRIPT.exists():
         sys.exit(0)
 
-    result = subprocess.run(
-        [sys.executable, str(APPLY_SCRIPT)],
-        capture_output=True,
-        text=True,
-    )
+    # Loading the modules also surfaces syntax errors before we touch settings
+    try:
+        mod = load_module("auto_approve_patterns", APPLY_SCRIPT)
+    except Exception as e:
+        print(f"[auto-approve] Failed to load {APPLY_SCRIPT}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Settings are current: skip loading the merge code altogether
+    key = fingerprint(mod)
+    if key is not None and read_fingerprint() == key:
+        sys.exit(0)
 
-    if result.returncode != 0:
-        print(f"[auto-approve] Failed to apply permissions: {result.stderr}", file=sys.stderr)
+    try:
+        common = load_module("auto_approve_common", COMMON_MODULE)
+    except Exception as e:
+        print(f"[auto-approve] Failed to load {COMMON_MODULE}: {e}", file=sys.stderr)
         sys.exit(1)
 
+    try:
+        updated, added_allow, added_deny = common.apply_patterns(
+            common.load_settings(SETTINGS_FILE), mod.ALLOW_PATTERNS, mod.DENY_PATTERNS
+        )
+        if added_allow or added_deny:
+            # Skip the directory fsync: a crash can at worst leave the previous settings.json,
+            # which the next session start re-applies to
+            common.save_settings(SETTINGS_FILE, updated, sync=False)
+    except Exception as e:
+        print(f"[auto-approve] Failed to apply permissions: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Re-fingerprint: applying may have rewritten settings.json and bumped its mtime
+    key = fingerprint(mod)
+    if key is not None:
+        try:
+            FINGERPRINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+            FINGERPRINT_FILE.write_text(key)
+        except OSError as e:
+            # Permissions are already applied; without a cache the next session just re-checks
+            print(f"[auto-approve] Failed to cache fingerprint: {e}", file=sys.stderr)
+
+
 if __name__ == "__main__":
     main()
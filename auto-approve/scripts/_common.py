@@ -0,0 +1,282 @@
+"""
+Shared implementation for the auto-approve permission scripts.
+
+Front-end scripts define their own ALLOW_PATTERNS / DENY_PATTERNS and call
+main() with them; everything that reads, merges, or writes settings.json
+lives here so the variants can't drift apart.
+"""
+
+import json
+import os
+import re
+from collections.abc import Callable, Collection, Iterable, Sequence
+from pathlib import Path
+
+# Summary lines printed by main(), keyed by (added any allow, added any deny)
+_APPLY_SUMMARY = {
+    (False, False): "  Adding 0 allow pattern(s)\n  All patterns already present - nothing to do.",
+    (True, False): "  Adding {added_allow} allow pattern(s)",
+    (False, True): "  Adding 0 allow pattern(s)\n  Adding {added_deny} deny pattern(s)",
+    (True, True): "  Adding {added_allow} allow pattern(s)\n  Adding {added_deny} deny pattern(s)",
+}
+
+
+# Splits a shell command into the parts --check matches separately: compound
+# operators, newlines, subshells and $(...) / `...` substitutions
+_SPLIT_COMMAND = re.compile(r"\$\(|&&|\|\||[;&|\n`()]")
+
+# Leading VAR=value assignments and wrapper commands that run the rest of the line
+_COMMAND_PREFIX = re.compile(r"(?:[A-Za-z_][A-Za-z0-9_]*=\S*\s+|(?:time|nohup|env|exec|command|builtin|nice)\s+)*")
+
+
+class PatternTrie:
+    """Character trie over permission patterns.
+
+    Answers whether a pattern is already covered by a stored one: either the
+    same string, or a broader "<prefix>*)" or "<prefix>:*)" pattern whose prefix
+    it starts with (e.g. "Bash(*)" covers "Bash(git status*)"). Lookups are
+    O(len(pattern)) regardless of how many patterns are stored.
+    """
+
+    _END = ""
+
+    def __init__(self, patterns=()):
+        self._root: dict = {}
+        for p in patterns:
+            self.add(p)
+
+    def add(self, pattern: str) -> None:
+        node = self._root
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[self._END] = True
+
+    def covers(self, pattern: str) -> bool:
+        node = self._root
+        for ch in pattern:
+            if self._END in node.get("*", {}).get(")", {}):
+                return True
+            if self._END in node.get(":", {}).get("*", {}).get(")", {}):
+                return True
+            node = node.get(ch)
+            if node is None:
+                return False
+        return self._END in node
+
+
+def find_settings_file(local: bool) -> Path:
+    if local:
+        return Path.cwd() / ".claude" / "settings.json"
+    return Path.home() / ".claude" / "settings.json"
+
+
+def dumps_settings(data: dict, compact: bool = False) -> bytes:
+    if compact:
+        return (json.dumps(data, separators=(",", ":")) + "\n").encode()
+    return (json.dumps(data, indent=2) + "\n").encode()
+
+
+def load_settings(path: Path) -> dict:
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return {}
+    return json.loads(raw)
+
+
+def save_settings(path: Path, data: dict, sync: bool = True, compact: "bool | None" = None) -> bool:
+    """Write settings as JSON. Returns False without writing if the file already has this content."""
+    # Only needed when something is actually written
+    import contextlib
+    import tempfile
+
+    # Write through a symlinked settings.json (dotfiles setups) instead of replacing the link
+    path = path.resolve()
+    try:
+        existing = path.read_bytes()
+        # By default keep the file's current layout: a single-line object stays compact,
+        # anything else (including an empty "{}") is indented
+        if compact is None:
+            stripped = existing.strip()
+            compact = b"\n" not in stripped and stripped not in (b"", b"{}")
+        content = dumps_settings(data, compact)
+        if existing == content:
+            return False
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        content = dumps_settings(data, bool(compact))
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write a unique sibling temp file and swap it in, so neither a crash nor a concurrent
+    # writer can leave a truncated settings.json. The payload is already fully serialized,
+    # so it normally goes out in a single write() call.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        try:
+            os.chmod(tmp, mode)
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+            # Always flush the data before the rename: some filesystems can otherwise
+            # surface a zero-length settings.json after a crash
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    # One fsync on the directory makes the rename itself durable
+    if sync and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return True
+
+
+def apply_patterns(settings: dict, allow_patterns: Sequence[str], deny_patterns: Sequence[str]) -> tuple[dict, int, int]:
+    """Merge allow/deny patterns into settings. Returns (updated, added_allow, added_deny)."""
+    perms = settings.setdefault("permissions", {})
+    existing_allow: list = perms.get("allow", [])
+    existing_deny: list = perms.get("deny", [])
+
+    # Skip patterns the user's settings already cover, exactly or via a broader glob
+    allow_trie = PatternTrie(existing_allow)
+    new_allow = [p for p in allow_patterns if not allow_trie.covers(p)]
+    perms["allow"] = [*existing_allow, *new_allow]
+
+    deny_trie = PatternTrie(existing_deny)
+    new_deny = [p for p in deny_patterns if not deny_trie.covers(p)]
+    perms["deny"] = [*existing_deny, *new_deny]
+
+    return settings, len(new_allow), len(new_deny)
+
+
+def remove_patterns(settings: dict, allow_patterns: Collection[str], deny_patterns: Collection[str]) -> tuple[dict, int, int]:
+    """Remove only the given patterns, leaving anything else the user added."""
+    if "permissions" not in settings:
+        return settings, 0, 0
+
+    perms = settings["permissions"]
+    before_allow = list(perms.get("allow", []))
+    before_deny = list(perms.get("deny", []))
+
+    # frozenset() of a frozenset is the same object, so callers can pass prebuilt sets
+    to_remove_allow = frozenset(allow_patterns)
+    to_remove_deny = frozenset(deny_patterns)
+    perms["allow"] = [p for p in before_allow if p not in to_remove_allow]
+    perms["deny"] = [p for p in before_deny if p not in to_remove_deny]
+
+    removed_allow = len(before_allow) - len(perms["allow"])
+    removed_deny = len(before_deny) - len(perms["deny"])
+
+    if not perms["allow"] and not perms["deny"]:
+        del perms["allow"]
+        del perms["deny"]
+    if not perms:
+        settings.pop("permissions", None)
+
+    return settings, removed_allow, removed_deny
+
+
+def compile_command_matcher(patterns: Iterable[str]) -> Callable[[str], bool]:
+    """Compile Bash rules into a single regex and return a predicate on shell commands.
+
+    Approximates Claude Code's matching: a bare "Bash" rule matches everything,
+    "Bash(git push:*)" and "Bash(git push*)" match commands that start with
+    "git push", and any other "*" matches any run of characters. Each part of a
+    compound command (&&, ||, ;, |, &, newlines, subshells, $(...) and `...`) is
+    checked on its own, with and without leading VAR=value assignments and
+    time/nohup/env/exec/command/builtin/nice wrappers. This is not a shell
+    parser: quoting, aliases, functions and eval are not understood. Non-Bash
+    rules are ignored.
+    """
+    alternatives = []
+    for p in patterns:
+        if p == "Bash":
+            alternatives.append(".*")
+        elif p.startswith("Bash(") and p.endswith(")"):
+            glob = p[len("Bash("):-1]
+            if glob.endswith(":*"):
+                glob = glob[:-2] + "*"
+            alternatives.append(".*".join(map(re.escape, glob.split("*"))))
+    if not alternatives:
+        return lambda command: False
+    regex = re.compile("(?:" + "|".join(alternatives) + r")\Z", re.DOTALL)
+
+    def matches(command: str) -> bool:
+        for part in _SPLIT_COMMAND.split(command):
+            part = part.strip().lstrip("{ ")
+            if regex.match(part) or regex.match(part[_COMMAND_PREFIX.match(part).end():]):
+                return True
+        return False
+
+    return matches
+
+
+def main(allow_patterns: Sequence[str], deny_patterns: Sequence[str], description: str, still_prompts: Sequence[str]) -> None:
+    # Imported here so the session-start hook, which only calls the helpers above, never pays for it
+    import argparse
+
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Preview changes without writing")
+    parser.add_argument("--local", action="store_true", help="Use .claude/settings.json in current directory")
+    parser.add_argument("--remove", action="store_true", help="Remove patterns added by this script")
+    parser.add_argument("--no-sync", action="store_true", help="Don't fsync the settings directory after writing")
+    parser.add_argument("--compact", action="store_true", help="Write settings.json on a single line instead of indented")
+    parser.add_argument("--check", metavar="COMMAND", help="Report whether a shell command matches the deny list (approximate)")
+    args = parser.parse_args()
+
+    settings_path = find_settings_file(args.local)
+    settings = load_settings(settings_path)
+
+    if args.check is not None:
+        is_denied = compile_command_matcher(settings.get("permissions", {}).get("deny", []))
+        verdict = "denied" if is_denied(args.check) else "not denied"
+        print(f"{verdict} by {settings_path}: {args.check}")
+        return
+
+    allow_set = frozenset(allow_patterns)
+    deny_set = frozenset(deny_patterns)
+
+    if args.remove:
+        updated, removed_allow, removed_deny = remove_patterns(settings, allow_set, deny_set)
+        if removed_allow == 0 and removed_deny == 0:
+            print(f"No auto-approve patterns in {settings_path} - nothing to remove.")
+            return
+        print(f"Removing {removed_allow} allow and {removed_deny} deny pattern(s) from {settings_path}")
+        if args.dry_run:
+            print("\n[dry-run] No changes written.")
+        else:
+            save_settings(settings_path, updated, sync=not args.no_sync, compact=True if args.compact else None)
+            print("Done. Restart Claude Code for changes to take effect.")
+        return
+
+    updated, added_allow, added_deny = apply_patterns(settings, allow_patterns, deny_patterns)
+
+    print(f"Settings file: {settings_path}")
+    print(_APPLY_SUMMARY[bool(added_allow), bool(added_deny)].format(added_allow=added_allow, added_deny=added_deny))
+    if added_allow == 0 and added_deny == 0:
+        return
+
+    if args.dry_run:
+        print("\nPermissions after applying:")
+        perms = updated.get("permissions", {})
+        for p in perms.get("allow", []):
+            marker = " *" if p in allow_set else ""
+            print(f"  allow: {p}{marker}")
+        for p in perms.get("deny", []):
+            marker = " *" if p in deny_set else ""
+            print(f"  deny: {p}{marker}")
+        print("\n[dry-run] No changes written.")
+    else:
+        save_settings(settings_path, updated, sync=not args.no_sync, compact=True if args.compact else None)
+        print("\nDone. Restart Claude Code for changes to take effect.")
+        print("\nOperations that still require confirmation:")
+        for line in still_prompts:
+            print(f"  {line}")
@@ -0,0 +1,293 @@
+"""
+Tests for the shared auto-approve helpers.
+
+Run from the repository root:
+    python3 -m unittest discover -s auto-approve/tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import _common  # noqa: E402
+from _common import (  # noqa: E402
+    PatternTrie,
+    apply_patterns,
+    compile_command_matcher,
+    remove_patterns,
+    save_settings,
+)
+
+
+class PatternTrieTest(unittest.TestCase):
+    def test_exact_match(self):
+        trie = PatternTrie(["Bash(ls)", "Read(*)"])
+        self.assertTrue(trie.covers("Bash(ls)"))
+        self.assertFalse(trie.covers("Bash(ls -l)"))
+
+    def test_broader_glob_covers_narrower(self):
+        trie = PatternTrie(["Bash(git push*)", "Bash(*)"])
+        self.assertTrue(trie.covers("Bash(git push --force*)"))
+        self.assertTrue(trie.covers("Bash(anything at all)"))
+
+    def test_colon_star_is_a_prefix_rule(self):
+        trie = PatternTrie(["Bash(git push:*)"])
+        self.assertTrue(trie.covers("Bash(git push*)"))
+        self.assertTrue(trie.covers("Bash(git push --force*)"))
+        self.assertFalse(trie.covers("Bash(git pull*)"))
+
+    def test_narrower_glob_does_not_cover_broader(self):
+        trie = PatternTrie(["Bash(git push*)"])
+        self.assertFalse(trie.covers("Bash(git *)"))
+        self.assertFalse(trie.covers("Bash(*)"))
+        self.assertFalse(trie.covers("Bash(git pus*)"))
+
+    def test_other_tools_are_independent(self):
+        trie = PatternTrie(["Read(*)"])
+        self.assertTrue(trie.covers("Read(/etc/hosts)"))
+        self.assertFalse(trie.covers("Write(*)"))
+
+    def test_empty(self):
+        self.assertFalse(PatternTrie().covers("Bash(ls)"))
+
+
+class ApplyPatternsTest(unittest.TestCase):
+    def test_adds_missing_patterns_after_existing_ones(self):
+        settings = {"model": "x", "permissions": {"allow": ["Bash(ls*)"]}}
+        updated, added_allow, added_deny = apply_patterns(settings, ["Read(*)", "Write(*)"], ["Bash(rm -rf*)"])
+        self.assertEqual((added_allow, added_deny), (2, 1))
+        self.assertEqual(updated["permissions"]["allow"], ["Bash(ls*)", "Read(*)", "Write(*)"])
+        self.assertEqual(updated["permissions"]["deny"], ["Bash(rm -rf*)"])
+        self.assertEqual(updated["model"], "x")
+
+    def test_is_idempotent(self):
+        settings, _, _ = apply_patterns({}, ["Read(*)"], ["Bash(sudo *)"])
+        _, added_allow, added_deny = apply_patterns(settings, ["Read(*)"], ["Bash(sudo *)"])
+        self.assertEqual((added_allow, added_deny), (0, 0))
+        self.assertEqual(settings["permissions"], {"allow": ["Read(*)"], "deny": ["Bash(sudo *)"]})
+
+    def test_skips_patterns_covered_by_broader_existing_ones(self):
+        settings = {"permissions": {"allow": ["Bash(*)"], "deny": ["Bash(git:*)"]}}
+        updated, added_allow, added_deny = apply_patterns(
+            settings, ["Bash(git status*)", "Read(*)"], ["Bash(git push*)", "Bash(sudo *)"]
+        )
+        self.assertEqual((added_allow, added_deny), (1, 1))
+        self.assertEqual(updated["permissions"]["allow"], ["Bash(*)", "Read(*)"])
+        self.assertEqual(updated["permissions"]["deny"], ["Bash(git:*)", "Bash(sudo *)"])
+
+
+class RemovePatternsTest(unittest.TestCase):
+    def test_no_permissions_key_is_left_alone(self):
+        settings = {"model": "x"}
+        self.assertEqual(remove_patterns(settings, ["Read(*)"], ["Bash(sudo *)"]), ({"model": "x"}, 0, 0))
+
+    def test_removes_only_managed_patterns(self):
+        settings = {"permissions": {"allow": ["Bash(ls*)", "Read(*)"], "deny": ["Bash(sudo *)", "Bash(mine)"]}}
+        updated, removed_allow, removed_deny = remove_patterns(
+            settings, frozenset(["Read(*)"]), frozenset(["Bash(sudo *)"])
+        )
+        self.assertEqual((removed_allow, removed_deny), (1, 1))
+        self.assertEqual(updated["permissions"], {"allow": ["Bash(ls*)"], "deny": ["Bash(mine)"]})
+
+    def test_drops_empty_permissions(self):
+        settings = {"model": "x", "permissions": {"allow": ["Read(*)"], "deny": []}}
+        updated, _, _ = remove_patterns(settings, ["Read(*)"], [])
+        self.assertEqual(updated, {"model": "x"})
+
+
+class SaveSettingsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.path = self.dir / "settings.json"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_new_file_is_indented(self):
+        self.assertTrue(save_settings(self.path, {"a": 1}))
+        self.assertEqual(self.path.read_text(), '{\n  "a": 1\n}\n')
+
+    def test_unchanged_content_is_not_rewritten(self):
+        save_settings(self.path, {"a": 1})
+        self.assertFalse(save_settings(self.path, {"a": 1}))
+
+    def test_keeps_compact_layout(self):
+        self.path.write_text('{"a":1}\n')
+        save_settings(self.path, {"a": 1, "b": 2})
+        self.assertEqual(self.path.read_text(), '{"a":1,"b":2}\n')
+
+    def test_keeps_indented_layout(self):
+        self.path.write_text('{\n  "a": 1\n}\n')
+        save_settings(self.path, {"a": 1, "b": 2})
+        self.assertEqual(self.path.read_text(), '{\n  "a": 1,\n  "b": 2\n}\n')
+
+    def test_compact_opt_in(self):
+        self.path.write_text('{\n  "a": 1\n}\n')
+        save_settings(self.path, {"a": 1}, compact=True)
+        self.assertEqual(self.path.read_text(), '{"a":1}\n')
+
+    def test_writes_through_symlink(self):
+        target = self.dir / "dotfiles" / "settings.json"
+        target.parent.mkdir()
+        target.write_text("{}\n")
+        self.path.symlink_to(target)
+        save_settings(self.path, {"a": 1})
+        self.assertTrue(self.path.is_symlink())
+        self.assertEqual(json.loads(target.read_text()), {"a": 1})
+
+    def test_preserves_mode_and_leaves_no_temp_files(self):
+        self.path.write_text("{}\n")
+        os.chmod(self.path, 0o600)
+        save_settings(self.path, {"a": 1})
+        self.assertEqual(self.path.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(os.listdir(self.dir), ["settings.json"])
+
+    def test_failed_replace_keeps_original_and_removes_temp_file(self):
+        self.path.write_text('{\n  "a": 1\n}\n')
+        with mock.patch.object(_common.os, "replace", side_effect=OSError(18, "Invalid cross-device link")):
+            with self.assertRaises(OSError):
+                save_settings(self.path, {"a": 2})
+        self.assertEqual(self.path.read_text(), '{\n  "a": 1\n}\n')
+        self.assertEqual(os.listdir(self.dir), ["settings.json"])
+
+    def test_no_sync_still_flushes_the_file(self):
+        with mock.patch.object(_common.os, "fsync") as fsync:
+            save_settings(self.path, {"a": 1})
+            self.assertEqual(fsync.call_count, 2)
+            fsync.reset_mock()
+            save_settings(self.path, {"a": 2}, sync=False)
+            self.assertEqual(fsync.call_count, 1)
+
+    def test_short_writes_are_completed(self):
+        real_write = os.write
+        with mock.patch.object(_common.os, "write", side_effect=lambda fd, data: real_write(fd, bytes(data[:3]))):
+            save_settings(self.path, {"key": "value"})
+        self.assertEqual(json.loads(self.path.read_text()), {"key": "value"})
+
+    def test_failed_write_keeps_original_and_removes_temp_file(self):
+        self.path.write_text('{\n  "a": 1\n}\n')
+        with mock.patch.object(_common.os, "write", side_effect=OSError(28, "No space left on device")):
+            with self.assertRaises(OSError):
+                save_settings(self.path, {"a": 2})
+        self.assertEqual(self.path.read_text(), '{\n  "a": 1\n}\n')
+        self.assertEqual(os.listdir(self.dir), ["settings.json"])
+
+
+class MainSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.home = Path(self._tmp.name)
+        self.settings = self.home / ".claude" / "settings.json"
+        self.settings.parent.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, {"HOME": str(self.home)}), \
+                mock.patch.object(sys, "argv", ["apply_permissions.py", *args]), \
+                contextlib.redirect_stdout(out):
+            _common.main(["Read(*)"], ["Bash(sudo *)"], "", ["sudo"])
+        return out.getvalue()
+
+    def test_reports_added_allow_and_deny(self):
+        out = self.run_main("--dry-run")
+        self.assertIn("  Adding 1 allow pattern(s)\n  Adding 1 deny pattern(s)\n", out)
+
+    def test_reports_deny_only(self):
+        self.settings.write_text('{"permissions": {"allow": ["Read(*)"]}}')
+        out = self.run_main("--dry-run")
+        self.assertIn("  Adding 0 allow pattern(s)\n  Adding 1 deny pattern(s)\n", out)
+
+    def test_reports_nothing_to_do(self):
+        self.settings.write_text('{"permissions": {"allow": ["Read(*)"], "deny": ["Bash(sudo *)"]}}')
+        out = self.run_main()
+        self.assertIn("  Adding 0 allow pattern(s)\n  All patterns already present - nothing to do.\n", out)
+        self.assertNotIn("Done.", out)
+
+    def test_remove_with_nothing_to_remove_does_not_write(self):
+        out = self.run_main("--remove")
+        self.assertIn("nothing to remove", out)
+        self.assertFalse(self.settings.exists())
+
+
+class CommandMatcherTest(unittest.TestCase):
+    def test_trailing_star_is_prefix(self):
+        matches = compile_command_matcher(["Bash(git push*)"])
+        self.assertTrue(matches("git push"))
+        self.assertTrue(matches("git push -f origin main"))
+        self.assertFalse(matches("echo git push"))
+        self.assertFalse(matches("git status"))
+
+    def test_colon_star_is_prefix(self):
+        matches = compile_command_matcher(["Bash(git push:*)"])
+        self.assertTrue(matches("git push origin"))
+        self.assertTrue(matches("git push"))
+        self.assertFalse(matches("git status"))
+
+    def test_bare_bash_matches_everything(self):
+        matches = compile_command_matcher(["Bash"])
+        self.assertTrue(matches("ls"))
+        self.assertTrue(matches(""))
+
+    def test_exact_pattern(self):
+        matches = compile_command_matcher(["Bash(x.y)"])
+        self.assertTrue(matches("x.y"))
+        self.assertFalse(matches("xzy"))
+        self.assertFalse(matches("x.y z"))
+
+    def test_inner_star(self):
+        matches = compile_command_matcher(["Bash(a*b)"])
+        self.assertTrue(matches("a middle b"))
+        self.assertFalse(matches("a middle"))
+
+    def test_compound_commands_match_any_part(self):
+        matches = compile_command_matcher(["Bash(git push*)"])
+        self.assertTrue(matches("cd x && git push"))
+        self.assertTrue(matches("make || git push"))
+        self.assertTrue(matches("ls; git push"))
+        self.assertTrue(matches("echo hi | git push"))
+        self.assertTrue(matches("(cd x; git push)"))
+        self.assertTrue(matches("true\ngit push"))
+        self.assertFalse(matches("cd x && git status"))
+
+    def test_command_substitution(self):
+        matches = compile_command_matcher(["Bash(git push*)"])
+        self.assertTrue(matches("$(git push)"))
+        self.assertTrue(matches("echo $(git push origin)"))
+        self.assertTrue(matches("`git push`"))
+        self.assertTrue(matches("echo `git push`"))
+
+    def test_leading_assignments(self):
+        matches = compile_command_matcher(["Bash(git push*)"])
+        self.assertTrue(matches("FOO=1 git push"))
+        self.assertTrue(matches("A=1 B=two git push origin"))
+
+    def test_wrapper_commands(self):
+        matches = compile_command_matcher(["Bash(git push*)"])
+        self.assertTrue(matches("time git push"))
+        self.assertTrue(matches("nohup git push"))
+        self.assertTrue(matches("env FOO=1 git push"))
+        self.assertFalse(matches("time git status"))
+
+    def test_rules_written_with_a_prefix_still_match(self):
+        matches = compile_command_matcher(["Bash(FOO=1 make*)"])
+        self.assertTrue(matches("FOO=1 make all"))
+
+    def test_non_bash_rules_are_ignored(self):
+        matches = compile_command_matcher(["Read(*)", "Write(*)"])
+        self.assertFalse(matches("git push"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests for the SessionStart hook's fingerprint cache.
+
+Run from the repository root:
+    python3 -m unittest discover -s auto-approve/tests
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SKILL_SOURCE = Path(__file__).resolve().parent.parent
+
+
+class SessionStartHookTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.home = Path(self._tmp.name)
+        skill_dir = self.home / ".claude" / "skills" / "auto-approve"
+        shutil.copytree(SKILL_SOURCE, skill_dir, ignore=shutil.ignore_patterns("tests", "__pycache__"))
+        self.hook = skill_dir / "hooks" / "session-start.py"
+        self.fingerprint = skill_dir / ".cache" / "fingerprint"
+        self.settings = self.home / ".claude" / "settings.json"
+        self.settings.write_text("{}\n")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_hook(self):
+        subprocess.run(
+            [sys.executable, str(self.hook)],
+            env={**os.environ, "HOME": str(self.home)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    def replace_settings_keeping_size(self, mtime_ns):
+        """Swap in different content of the same size, with the given mtime."""
+        size = self.settings.stat().st_size
+        pad = size - len(json.dumps({"pad": ""}, indent=2) + "\n")
+        self.settings.write_text(json.dumps({"pad": "x" * pad}, indent=2) + "\n")
+        self.assertEqual(self.settings.stat().st_size, size)
+        os.utime(self.settings, ns=(mtime_ns, mtime_ns))
+
+    def allow_patterns(self):
+        return json.loads(self.settings.read_text()).get("permissions", {}).get("allow", [])
+
+    def test_miss_applies_and_caches(self):
+        self.run_hook()
+        self.assertIn("Bash(*)", self.allow_patterns())
+        self.assertTrue(self.fingerprint.exists())
+
+    def test_hit_skips_apply(self):
+        self.run_hook()
+        self.replace_settings_keeping_size(self.settings.stat().st_mtime_ns)
+        self.run_hook()
+        self.assertEqual(self.allow_patterns(), [])
+
+    def test_changed_mtime_misses(self):
+        self.run_hook()
+        self.replace_settings_keeping_size(self.settings.stat().st_mtime_ns + 1_000_000_000)
+        self.run_hook()
+        self.assertIn("Bash(*)", self.allow_patterns())
+
+    def test_unwritable_cache_is_not_fatal(self):
+        self.fingerprint.parent.parent.mkdir(parents=True, exist_ok=True)
+        self.fingerprint.parent.write_text("not a directory")
+        self.run_hook()
+        self.assertIn("Bash(*)", self.allow_patterns())
+
+
+if __name__ == "__main__":
+    unittest.main()